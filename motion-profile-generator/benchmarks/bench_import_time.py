@@ -0,0 +1,120 @@
+"""量測各模組在全新直譯器中的匯入時間，並檢查是否載入了不必要的套件。
+
+每個目標都在獨立的子程序中匯入，取多次執行的中位數。核心模組 (models、
+utils.setpoint_ring) 採白名單檢查：匯入後新增的頂層模組扣除標準函式庫、numpy
+與專案本身後必須為空；GUI 與繪圖模組則不得在匯入時就載入 matplotlib / scipy。
+任何檢查未通過、匯入時間超過 --max-ms，或任何目標匯入失敗，都會以非零狀態
+結束，方便放進 CI 偵測啟動延遲的退化。只有在環境缺少 tkinter 時才會略過相關目標。
+
+白名單檢查使用 sys.stdlib_module_names，需要 Python 3.10 以上。
+
+用法:
+    python benchmarks/bench_import_time.py [--runs 10] [--max-ms 200]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# 作為比較基準，不做檢查
+BASELINE = 'import numpy'
+
+# 核心模組允許載入的非標準函式庫套件；__mp_main__ 是 multiprocessing 為主模組建立的別名
+CORE_ALLOWED = ('numpy', 'models', 'utils', '__main__', '__mp_main__')
+
+# (匯入敘述, 允許載入的非標準函式庫套件 (None 表示不做白名單檢查), 不應載入的套件)
+TARGETS = [
+    ('from models import SCurve', CORE_ALLOWED, ()),
+    ('import utils.setpoint_ring', CORE_ALLOWED, ()),
+    ('import utils.plotter', None, ('matplotlib', 'scipy')),
+    ('import gui.profile_generator_gui', None, ('matplotlib', 'scipy')),
+]
+
+_PROBE = """
+import sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+try:
+    {statement}
+except ModuleNotFoundError as e:
+    # 只有缺少 tkinter 的環境可以略過，其他匯入錯誤一律視為失敗
+    if e.name not in ('tkinter', '_tkinter'):
+        raise
+    print('skip', e.name)
+    sys.exit(0)
+elapsed = time.perf_counter() - start
+added = {{name.split('.')[0] for name in set(sys.modules) - before}}
+allowed = {allowed!r}
+if allowed is None:
+    loaded = added & set({forbidden!r})
+else:
+    loaded = added - sys.stdlib_module_names - set(allowed)
+print(elapsed, ','.join(sorted(loaded)))
+"""
+
+
+def measure(statement, allowed, forbidden, runs):
+    """回傳 (匯入耗時中位數 (秒), 直譯器總耗時中位數 (秒), 不應載入卻被載入的套件)。
+
+    環境缺少 tkinter 時回傳 None；其他匯入失敗會拋出 RuntimeError。
+    """
+    env = dict(os.environ, PYTHONPATH=SRC)
+    code = _PROBE.format(statement=statement, allowed=allowed, forbidden=list(forbidden))
+    import_times = []
+    wall_times = []
+    loaded = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], env=env,
+                                capture_output=True, text=True)
+        wall_times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        elapsed, _, modules = result.stdout.strip().partition(' ')
+        if elapsed == 'skip':
+            return None
+        import_times.append(float(elapsed))
+        loaded = modules.split(',') if modules else []
+    return statistics.median(import_times), statistics.median(wall_times), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='每個專案模組的匯入時間中位數上限 (毫秒)')
+    args = parser.parse_args()
+
+    import_time, wall_time, _ = measure(BASELINE, None, (), args.runs)
+    print(f"{BASELINE:<36} import {import_time * 1e3:7.1f} ms   "
+          f"process {wall_time * 1e3:7.1f} ms   baseline")
+
+    failed = False
+    for statement, allowed, forbidden in TARGETS:
+        try:
+            result = measure(statement, allowed, forbidden, args.runs)
+        except RuntimeError as e:
+            print(f"{statement:<36} FAILED ({e})")
+            failed = True
+            continue
+        if result is None:
+            print(f"{statement:<36} skipped (tkinter is not available)")
+            continue
+        import_time, wall_time, loaded = result
+        problems = []
+        if loaded:
+            problems.append('LOADED ' + ', '.join(loaded))
+        if args.max_ms is not None and import_time * 1e3 > args.max_ms:
+            problems.append(f'OVER {args.max_ms:g} ms')
+        failed |= bool(problems)
+        print(f"{statement:<36} import {import_time * 1e3:7.1f} ms   "
+              f"process {wall_time * 1e3:7.1f} ms   {'; '.join(problems) or 'ok'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""量測同一個 SCurve 重複規劃時，有無 ProfileWorkspace 的記憶體配置與耗時。
+
+每次呼叫後在仍持有回傳值時拍下 tracemalloc 快照，並以 NumPy 的 tracemalloc
+domain 篩選，只計入 NumPy 陣列資料的配置。使用工作區時這個值必須為 0；此外
+單次呼叫的配置峰值 (包含呼叫中途釋放的暫存陣列) 不得超過 --max-alloc-kib
+(預設遠小於一個 1024 點的 float64 陣列)。任一條件不成立即以非零狀態結束，
+方便偵測退化。
+
+用法:
+    python benchmarks/bench_profile_workspace.py [--repeats 50] [--dt 0.001] [--max-alloc-kib 4]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.s_curve import ProfileWorkspace, SCurve  # noqa: E402
+
+
+def measure(scurve, dt, repeats, out):
+    """回傳 (每次呼叫的平均耗時, 單次呼叫的最大配置峰值, 單次呼叫配置的最大 NumPy 陣列資料量)。"""
+    # 暖身：讓工作區擴充到所需容量
+    scurve.calculate_profile(dt, out=out)
+
+    numpy_data = [tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)]
+    tracemalloc.start()
+    peak = 0
+    array_bytes = 0
+    for _ in range(repeats):
+        # clear_traces 同時重設目前配置量與峰值，之後的紀錄只屬於這次呼叫
+        tracemalloc.clear_traces()
+        profile = scurve.calculate_profile(dt, out=out)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        # 仍持有回傳值時拍快照，回傳的陣列若是新配置的就會被計入
+        snapshot = tracemalloc.take_snapshot().filter_traces(numpy_data)
+        array_bytes = max(array_bytes, sum(trace.size for trace in snapshot.traces))
+        del profile, snapshot
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        scurve.calculate_profile(dt, out=out)
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed, peak, array_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--dt', type=float, default=0.001)
+    parser.add_argument('--max-alloc-kib', type=float, default=4.0)
+    args = parser.parse_args()
+
+    scurve = SCurve(1.0, 0.5, 1.0, 2.0)
+    samples = len(scurve.calculate_profile(args.dt)['time'])
+    print(f"{args.repeats} replans x {samples} samples")
+
+    failed = False
+    for label, out in (('fresh', None), ('workspace', ProfileWorkspace())):
+        elapsed, peak, array_bytes = measure(scurve, args.dt, args.repeats, out)
+        status = ''
+        if out is not None:
+            problems = []
+            if array_bytes:
+                problems.append(f'NUMPY DATA {array_bytes} B')
+            if peak > args.max_alloc_kib * 1024:
+                problems.append(f'OVER {args.max_alloc_kib:g} KiB')
+            failed |= bool(problems)
+            status = '; '.join(problems) or 'ok'
+        print(f"{label:<10} {elapsed * 1e3:8.2f} ms/call   "
+              f"peak alloc/call {peak / 1024:8.1f} KiB   "
+              f"numpy data/call {array_bytes / 1024:8.1f} KiB   {status}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
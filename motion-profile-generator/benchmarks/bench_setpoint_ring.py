@@ -0,0 +1,134 @@
+"""比較以 Pipe 傳送 pickle 的運動曲線與共享記憶體環形緩衝區的吞吐量與延遲。
+
+用法:
+    python benchmarks/bench_setpoint_ring.py [--moves 2000] [--capacity 4096]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.s_curve import SCurve  # noqa: E402
+from utils.setpoint_ring import SAMPLE_DTYPE, SetpointRing  # noqa: E402
+
+# 額外記錄寫入時間戳，用來計算跨程序延遲
+BENCH_DTYPE = np.dtype(SAMPLE_DTYPE.descr + [('stamp', np.int64)])
+
+FIELDS = {
+    'time': 'time',
+    'position': 'position',
+    'velocity': 'velocity',
+    'acceleration': 'acceleration',
+    'jerk': 'jerk',
+    'stage': 'stages',
+}
+
+
+def _pipe_consumer(conn, results):
+    samples = 0
+    latencies = []
+    while True:
+        msg = conn.recv()
+        now = time.perf_counter_ns()
+        if msg is None:
+            break
+        stamp, profile = msg
+        samples += len(profile['time'])
+        latencies.append(now - stamp)
+    results.put((samples, latencies))
+
+
+def _ring_consumer(ring, results):
+    consumer = ring.consumer()
+    samples = 0
+    latencies = []
+    checksum = 0.0
+    view = None
+    while not consumer.drained:
+        _, view = consumer.acquire(timeout=None)
+        now = time.perf_counter_ns()
+        if len(view):
+            samples += len(view)
+            latencies.append(now - int(view['stamp'][-1]))
+            # 實際讀取資料，避免只量到指標移動
+            checksum += float(view['position'][-1])
+        consumer.release()
+    consumer.close()
+    del view
+    ring.close()
+    results.put((samples, latencies))
+
+
+def _report(label, samples, elapsed, latencies):
+    lat = np.asarray(latencies) / 1e3
+    print(f"{label:<6} {samples / elapsed / 1e6:8.2f} M samples/s   "
+          f"latency p50 {np.percentile(lat, 50):8.1f} us   "
+          f"p99 {np.percentile(lat, 99):8.1f} us")
+
+
+def bench_pipe(profile, moves):
+    parent, child = mp.Pipe()
+    results = mp.Queue()
+    proc = mp.Process(target=_pipe_consumer, args=(child, results))
+    proc.start()
+
+    start = time.perf_counter()
+    for _ in range(moves):
+        parent.send((time.perf_counter_ns(), profile))
+    parent.send(None)
+    samples, latencies = results.get()
+    elapsed = time.perf_counter() - start
+    proc.join()
+    _report('pipe', samples, elapsed, latencies)
+
+
+def bench_ring(profile, moves, capacity):
+    ring = SetpointRing.create(capacity, dtype=BENCH_DTYPE)
+    results = mp.Queue()
+    proc = mp.Process(target=_ring_consumer, args=(ring, results))
+    proc.start()
+    # 等待消費者連線，避免一開始的資料被視為無人讀取
+    ring.wait_for_consumers()
+
+    producer = ring.producer()
+    view = None
+    total = len(profile['time'])
+    start = time.perf_counter()
+    for _ in range(moves):
+        written = 0
+        while written < total:
+            view = producer.reserve(total - written)
+            n = len(view)
+            for field, key in FIELDS.items():
+                view[field] = profile[key][written:written + n]
+            view['stamp'] = time.perf_counter_ns()
+            producer.commit(n)
+            written += n
+    producer.close()
+    samples, latencies = results.get()
+    elapsed = time.perf_counter() - start
+    proc.join()
+    del view
+    ring.close()
+    _report('ring', samples, elapsed, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--moves', type=int, default=2000)
+    parser.add_argument('--capacity', type=int, default=4096)
+    args = parser.parse_args()
+
+    profile = SCurve(1.0, 0.5, 1.0, 2.0).calculate_profile(dt=0.001)
+    print(f"{args.moves} moves x {len(profile['time'])} samples")
+    bench_pipe(profile, args.moves)
+    bench_ring(profile, args.moves, args.capacity)
+
+
+if __name__ == '__main__':
+    main()
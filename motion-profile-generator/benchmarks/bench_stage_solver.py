@@ -0,0 +1,50 @@
+"""量測對稱與非對稱加減速限制下，逐一規劃與批次規劃階段時間的耗時。
+
+用法:
+    python benchmarks/bench_stage_solver.py [--moves 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.s_curve import SCurve, solve_stage_durations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--moves', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    distance = rng.uniform(0.01, 2.0, args.moves)
+    max_speed, max_acceleration, max_jerk = 0.5, 1.0, 2.0
+
+    cases = {
+        'symmetric': (max_acceleration, max_jerk),
+        'asymmetric': (2.5 * max_acceleration, 4 * max_jerk),
+    }
+    for label, (max_deceleration, max_decel_jerk) in cases.items():
+        start = time.perf_counter()
+        result = solve_stage_durations(distance, max_speed, max_acceleration, max_jerk,
+                                       max_deceleration, max_decel_jerk)
+        batch = (time.perf_counter() - start) / args.moves
+
+        scalar_moves = min(args.moves, 2000)
+        start = time.perf_counter()
+        for d in distance[:scalar_moves]:
+            SCurve(d, max_speed, max_acceleration, max_jerk,
+                   max_deceleration, max_decel_jerk).generate_stages()
+        scalar = (time.perf_counter() - start) / scalar_moves
+
+        cycle_time = result['durations'].sum(axis=-1).mean()
+        print(f"{label:<11} batch {batch * 1e9:7.1f} ns/move   "
+              f"scalar {scalar * 1e6:7.1f} us/move   mean move time {cycle_time:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
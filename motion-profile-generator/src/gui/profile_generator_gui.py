@@ -1,11 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 from models.s_curve import SCurve
 from tkinter import filedialog
 
+# matplotlib 於建立視窗時才載入，僅匯入本模組不會付出其啟動成本
+
 class ProfileGeneratorGUI:
     def __init__(self, root):
         self.root = root
@@ -27,10 +26,14 @@ class ProfileGeneratorGUI:
         self.max_speed = tk.DoubleVar(value=0.5)
         self.max_acceleration = tk.DoubleVar(value=1.0)
         self.max_jerk = tk.DoubleVar(value=2.0)
+        self.max_deceleration = tk.DoubleVar(value=1.0)
+        self.max_decel_jerk = tk.DoubleVar(value=2.0)
         
         # Create input labels and entries
-        labels = ["Distance (m):", "Max Speed (m/s):", "Max Acceleration (m/s²):", "Max Jerk (m/s³):"]
-        variables = [self.distance, self.max_speed, self.max_acceleration, self.max_jerk]
+        labels = ["Distance (m):", "Max Speed (m/s):", "Max Acceleration (m/s²):", "Max Jerk (m/s³):",
+                  "Max Deceleration (m/s²):", "Max Decel Jerk (m/s³):"]
+        variables = [self.distance, self.max_speed, self.max_acceleration, self.max_jerk,
+                     self.max_deceleration, self.max_decel_jerk]
         
         for i, (label, var) in enumerate(zip(labels, variables)):
             ttk.Label(input_frame, text=label).grid(row=i, column=0, padx=5, pady=5)
@@ -50,6 +53,9 @@ class ProfileGeneratorGUI:
         self.plot_frame = ttk.Frame(root, padding="10")
         self.plot_frame.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
         # 設置 matplotlib 支援中文字體
         plt.rcParams['font.family'] = ['Microsoft JhengHei', 'Arial']
         
@@ -71,7 +77,6 @@ class ProfileGeneratorGUI:
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
 
         # Add toolbar
-        from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.plot_frame)
         self.toolbar.pack()
 
@@ -95,8 +100,11 @@ class ProfileGeneratorGUI:
             max_speed = self.max_speed.get()
             max_acceleration = self.max_acceleration.get()
             max_jerk = self.max_jerk.get()
+            max_deceleration = self.max_deceleration.get()
+            max_decel_jerk = self.max_decel_jerk.get()
             
-            if any(v <= 0 for v in [distance, max_speed, max_acceleration, max_jerk]):
+            if any(v <= 0 for v in [distance, max_speed, max_acceleration, max_jerk,
+                                    max_deceleration, max_decel_jerk]):
                 messagebox.showerror("錯誤", "所有參數必須大於0")
                 return False
             
@@ -117,6 +125,12 @@ class ProfileGeneratorGUI:
             messagebox.showerror("參數錯誤", msg)
             return False
         
+        if scurve.max_decel_jerk < scurve.max_deceleration:
+            msg = f"減速加加速度 ({scurve.max_decel_jerk:.2f}) 小於減速度 ({scurve.max_deceleration:.2f})！\n"
+            msg += "加加速度應該大於加速度才能產生合理的運動規劃。"
+            messagebox.showerror("參數錯誤", msg)
+            return False
+        
         # 檢查加加速度是否足夠大
         min_time_to_max_accel = scurve.max_acceleration / scurve.max_jerk
         if min_time_to_max_accel > 1.0:
@@ -146,7 +160,9 @@ class ProfileGeneratorGUI:
                 self.distance.get(),
                 self.max_speed.get(),
                 self.max_acceleration.get(),
-                self.max_jerk.get()
+                self.max_jerk.get(),
+                self.max_deceleration.get(),
+                self.max_decel_jerk.get()
             )
             
             # 檢查參數是否合理
@@ -223,11 +239,12 @@ class ProfileGeneratorGUI:
             self.axs[3].set_xlabel('時間 (s)', fontsize=9)
             
             # 添加圖例
+            from matplotlib.lines import Line2D
             stage_names = ['加加速', '加速', '減加加速', '等速', '減加加速', '減速', '加加加速']
             legend_elements = []
             for i, name in enumerate(stage_names):
                 if i < len(colors):
-                    legend_elements.append(plt.Line2D([0], [0], color=colors[i], label=name))
+                    legend_elements.append(Line2D([0], [0], color=colors[i], label=name))
             
             self.axs[0].legend(handles=legend_elements, loc='upper right')
             
@@ -1 +1,3 @@
-# This file is intentionally left blank.
\ No newline at end of file
+from .s_curve import ProfileWorkspace, SCurve, solve_stage_durations
+
+__all__ = ["ProfileWorkspace", "SCurve", "solve_stage_durations"]
@@ -1,5 +1,283 @@
+import math
+
 import numpy as np
 
+# generate_stages 使用的完整 7 段順序
+STAGE_NAMES = ['J1', 'A', 'J2', 'V', 'J3', 'D', 'J4']
+
+# 剩餘距離小於此相對比例時不產生恆速階段，避免捨入誤差決定階段數
+_CRUISE_RTOL = 1e-12
+
+
+def _ramp_distance(v, acceleration, jerk):
+    """從靜止加速到速度 v (或由 v 減速到靜止) 所需的最短距離。"""
+    saturated = v >= acceleration * acceleration / jerk
+    return np.where(saturated,
+                    0.5 * v * (v / acceleration + acceleration / jerk),
+                    v * np.sqrt(v / jerk))
+
+
+def _ramp_times(v, acceleration, jerk):
+    """加速到速度 v 的 (加加速段時間, 等加速段時間)。
+
+    v 小於 acceleration² / jerk 時無法達到最大加速度，沒有等加速段。
+    """
+    saturated = v >= acceleration * acceleration / jerk
+    t_j = np.where(saturated, acceleration / jerk, np.sqrt(v / jerk))
+    t_a = np.where(saturated, v / acceleration - acceleration / jerk, 0.0)
+    return t_j, t_a
+
+
+def _mixed_peak_speed(distance, acceleration, jerk, other_jerk):
+    """一側達到最大加速度、另一側只受加加速度限制時的峰值速度。
+
+    令 u = sqrt(v)，距離方程式為
+        u⁴ + 2A/sqrt(J') u³ + A²/J u² - 2AD = 0，
+    再以 w = 1/u 代換成缺三次項的四次方程式，用 Ferrari 公式求唯一的正根。
+    Ferrari 公式的相消誤差可達 1e-10 量級，最後在原方程式上做一次牛頓修正。
+    """
+    e = -2 * acceleration * distance
+    p = acceleration * acceleration / jerk / e
+    q = 2 * acceleration / np.sqrt(other_jerk) / e
+    r = 1 / e
+
+    # 預解三次方程式 m³ + p m² + (p²/4 - r) m - q²/8 = 0 的最大實根
+    a1 = p * p / 4 - r
+    a0 = -q * q / 8
+    P = a1 - p * p / 3
+    Q = 2 * p ** 3 / 27 - p * a1 / 3 + a0
+    disc = (Q / 2) ** 2 + (P / 3) ** 3
+    sqrt_disc = np.sqrt(np.maximum(disc, 0))
+    y_one = np.cbrt(-Q / 2 + sqrt_disc) + np.cbrt(-Q / 2 - sqrt_disc)
+    P_neg = np.minimum(P, -np.finfo(float).tiny)
+    cos_arg = np.clip(1.5 * Q / P_neg * np.sqrt(-3 / P_neg), -1, 1)
+    y_three = 2 * np.sqrt(-P_neg / 3) * np.cos(np.arccos(cos_arg) / 3)
+    m = np.where(disc >= 0, y_one, y_three) - p / 3
+
+    # 拆成兩個二次方程式，取最大的實根
+    s = np.sqrt(2 * m)
+    w_plus = (s + np.sqrt(s * s - 4 * (p / 2 + m + q / (2 * s)))) / 2
+    w_minus = (-s + np.sqrt(s * s - 4 * (p / 2 + m - q / (2 * s)))) / 2
+    w = np.fmax(w_plus, w_minus)
+    return _polish_mixed_root(1 / w, distance, acceleration, jerk, other_jerk) ** 2
+
+
+def _ramp_distance_scalar(v, acceleration, jerk):
+    """_ramp_distance 的純量版本。"""
+    if v >= acceleration * acceleration / jerk:
+        return 0.5 * v * (v / acceleration + acceleration / jerk)
+    return v * math.sqrt(v / jerk)
+
+
+def _ramp_times_scalar(v, acceleration, jerk):
+    """_ramp_times 的純量版本。"""
+    if v >= acceleration * acceleration / jerk:
+        return acceleration / jerk, v / acceleration - acceleration / jerk
+    return math.sqrt(v / jerk), 0.0
+
+
+def _mixed_peak_speed_scalar(distance, acceleration, jerk, other_jerk):
+    """_mixed_peak_speed 的純量版本，只計算實際成立的分支。"""
+    e = -2 * acceleration * distance
+    p = acceleration * acceleration / jerk / e
+    q = 2 * acceleration / math.sqrt(other_jerk) / e
+    r = 1 / e
+
+    a1 = p * p / 4 - r
+    a0 = -q * q / 8
+    P = a1 - p * p / 3
+    Q = 2 * p ** 3 / 27 - p * a1 / 3 + a0
+    disc = (Q / 2) ** 2 + (P / 3) ** 3
+    if disc >= 0:
+        sqrt_disc = math.sqrt(disc)
+        y = _cbrt(-Q / 2 + sqrt_disc) + _cbrt(-Q / 2 - sqrt_disc)
+    else:
+        cos_arg = min(max(1.5 * Q / P * math.sqrt(-3 / P), -1.0), 1.0)
+        y = 2 * math.sqrt(-P / 3) * math.cos(math.acos(cos_arg) / 3)
+    m = y - p / 3
+
+    s = math.sqrt(2 * m)
+    w = -math.inf
+    for sign in (1, -1):
+        root_disc = s * s - 4 * (p / 2 + m + sign * q / (2 * s))
+        if root_disc >= 0:
+            w = max(w, (sign * s + math.sqrt(root_disc)) / 2)
+    return _polish_mixed_root(1 / w, distance, acceleration, jerk, other_jerk, math.sqrt) ** 2
+
+
+def _polish_mixed_root(u, distance, acceleration, jerk, other_jerk, sqrt=np.sqrt):
+    """對 u⁴ + 2A/sqrt(J') u³ + A²/J u² - 2AD = 0 的近似根 u 做一次牛頓修正。"""
+    b3 = 2 * acceleration / sqrt(other_jerk)
+    b2 = acceleration * acceleration / jerk
+    f = ((u + b3) * u + b2) * u * u - 2 * acceleration * distance
+    df = ((4 * u + 3 * b3) * u + 2 * b2) * u
+    return u - f / df
+
+
+def _cbrt(x):
+    return math.copysign(abs(x) ** (1 / 3), x)
+
+
+def _solve_stage_durations_scalar(distance, max_speed, max_acceleration, max_jerk,
+                                  max_deceleration, max_decel_jerk):
+    """solve_stage_durations 的純量版本，以 Python 浮點數計算，供單次規劃使用。
+
+    Returns:
+        tuple: (峰值速度, STAGE_NAMES 中 7 個階段的時間列表)
+    """
+    D, V = distance, max_speed
+    A, J, Ad, Jd = max_acceleration, max_jerk, max_deceleration, max_decel_jerk
+
+    if D >= _ramp_distance_scalar(V, A, J) + _ramp_distance_scalar(V, Ad, Jd):
+        # 距離足以達到最大速度
+        peak = V
+    else:
+        v_accel = A * A / J
+        v_decel = Ad * Ad / Jd
+        v_low = min(v_accel, v_decel)
+        v_high = max(v_accel, v_decel)
+        if D <= _ramp_distance_scalar(v_low, A, J) + _ramp_distance_scalar(v_low, Ad, Jd):
+            # 兩側皆未達最大加速度
+            peak = (D / (1 / math.sqrt(J) + 1 / math.sqrt(Jd))) ** (2 / 3)
+        elif D <= _ramp_distance_scalar(v_high, A, J) + _ramp_distance_scalar(v_high, Ad, Jd):
+            # 只有一側達到最大加速度
+            if v_accel <= v_decel:
+                peak = _mixed_peak_speed_scalar(D, A, J, Jd)
+            else:
+                peak = _mixed_peak_speed_scalar(D, Ad, Jd, J)
+        else:
+            # 兩側皆達到最大加速度
+            alpha = 0.5 / A + 0.5 / Ad
+            beta = 0.5 * A / J + 0.5 * Ad / Jd
+            peak = 2 * D / (beta + math.sqrt(beta * beta + 4 * alpha * D))
+        peak = min(peak, V)
+
+    t_j_accel, t_a_accel = _ramp_times_scalar(peak, A, J)
+    t_j_decel, t_a_decel = _ramp_times_scalar(peak, Ad, Jd)
+    ramp_distance = _ramp_distance_scalar(peak, A, J) + _ramp_distance_scalar(peak, Ad, Jd)
+    # 捨入誤差造成的極小剩餘距離視為沒有恆速階段
+    cruise = D - ramp_distance
+    t_v = cruise / peak if cruise > _CRUISE_RTOL * D else 0.0
+    return peak, [t_j_accel, t_a_accel, t_j_accel, t_v, t_j_decel, t_a_decel, t_j_decel]
+
+
+def solve_stage_durations(distance, max_speed, max_acceleration, max_jerk,
+                          max_deceleration=None, max_decel_jerk=None):
+    """以解析解計算 S 型曲線各階段時間，不需迭代。
+
+    所有參數皆可為純量或可廣播的 NumPy 陣列，可一次規劃多組移動。
+    加速與減速可使用不同的加速度與加加速度限制。
+
+    Args:
+        distance (float | numpy.ndarray): 移動距離
+        max_speed (float | numpy.ndarray): 最大速度限制
+        max_acceleration (float | numpy.ndarray): 最大加速度限制
+        max_jerk (float | numpy.ndarray): 加速段的最大加加速度限制
+        max_deceleration (float | numpy.ndarray): 最大減速度限制，None 時與 max_acceleration 相同
+        max_decel_jerk (float | numpy.ndarray): 減速段的最大加加速度限制，None 時與 max_jerk 相同
+
+    Returns:
+        dict: 'peak_speed' 為峰值速度；'durations' 的最後一維依序為
+            STAGE_NAMES 中 7 個階段的時間
+
+    Raises:
+        ValueError: 當任何距離或限制小於或等於0時
+    """
+    if max_deceleration is None:
+        max_deceleration = max_acceleration
+    if max_decel_jerk is None:
+        max_decel_jerk = max_jerk
+
+    D, V, A, J, Ad, Jd = np.broadcast_arrays(*(
+        np.asarray(x, dtype=float)
+        for x in (distance, max_speed, max_acceleration, max_jerk, max_deceleration, max_decel_jerk)
+    ))
+    if any(np.any(x <= 0) for x in (D, V, A, J, Ad, Jd)):
+        raise ValueError("All parameters must be positive")
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # 距離足以達到最大速度時直接使用最大速度
+        cruise_distance = _ramp_distance(V, A, J) + _ramp_distance(V, Ad, Jd)
+
+        # 否則依峰值速度落在哪個區間，分別求解距離方程式
+        v_accel = A * A / J
+        v_decel = Ad * Ad / Jd
+        v_low = np.minimum(v_accel, v_decel)
+        v_high = np.maximum(v_accel, v_decel)
+        d_low = _ramp_distance(v_low, A, J) + _ramp_distance(v_low, Ad, Jd)
+        d_high = _ramp_distance(v_high, A, J) + _ramp_distance(v_high, Ad, Jd)
+
+        # 兩側皆未達最大加速度：v^1.5 (1/sqrt(J) + 1/sqrt(Jd)) = D
+        v_jerk = (D / (1 / np.sqrt(J) + 1 / np.sqrt(Jd))) ** (2 / 3)
+
+        # 兩側皆達到最大加速度：alpha v² + beta v - D = 0
+        alpha = 0.5 / A + 0.5 / Ad
+        beta = 0.5 * A / J + 0.5 * Ad / Jd
+        v_accel_limited = 2 * D / (beta + np.sqrt(beta * beta + 4 * alpha * D))
+
+        # 只有一側達到最大加速度
+        accel_saturates = v_accel <= v_decel
+        v_mixed = _mixed_peak_speed(
+            D,
+            np.where(accel_saturates, A, Ad),
+            np.where(accel_saturates, J, Jd),
+            np.where(accel_saturates, Jd, J),
+        )
+
+        peak = np.where(D <= d_low, v_jerk, np.where(D <= d_high, v_mixed, v_accel_limited))
+        peak = np.where(D >= cruise_distance, V, np.minimum(peak, V))
+
+        t_j_accel, t_a_accel = _ramp_times(peak, A, J)
+        t_j_decel, t_a_decel = _ramp_times(peak, Ad, Jd)
+        ramp_distance = _ramp_distance(peak, A, J) + _ramp_distance(peak, Ad, Jd)
+        cruise = D - ramp_distance
+        t_v = np.where(cruise > _CRUISE_RTOL * D, cruise / peak, 0.0)
+
+    durations = np.stack([t_j_accel, t_a_accel, t_j_accel, t_v,
+                          t_j_decel, t_a_decel, t_j_decel], axis=-1)
+    return {'peak_speed': peak, 'durations': durations}
+
+class ProfileWorkspace:
+    """calculate_profile 可重複使用的輸出緩衝區。
+
+    在迴圈中重複規劃時傳入同一個 ProfileWorkspace，可避免每次呼叫都重新配置陣列。
+    容量不足時會自動擴充，之後的呼叫即不再配置記憶體。
+
+    Attributes:
+        capacity (int): 目前可容納的取樣點數量
+        time, position, velocity, acceleration, jerk (numpy.ndarray): 長度為 capacity 的輸出陣列
+        stages (numpy.ndarray): 長度為 capacity 的階段索引陣列
+    """
+
+    def __init__(self, capacity=0):
+        """初始化輸出緩衝區。
+
+        Args:
+            capacity (int): 預先配置的取樣點數量
+        """
+        self._allocate(capacity)
+
+    def reserve(self, capacity):
+        """確保緩衝區至少可容納 capacity 個取樣點。
+
+        Args:
+            capacity (int): 所需的取樣點數量
+        """
+        if capacity <= self.capacity:
+            return
+        # 以倍數擴充，避免長度逐漸增加時反覆配置
+        self._allocate(max(capacity, 2 * self.capacity))
+
+    def _allocate(self, capacity):
+        self.index = np.arange(capacity, dtype=float)
+        self.time = np.empty(capacity)
+        self.position = np.empty(capacity)
+        self.velocity = np.empty(capacity)
+        self.acceleration = np.empty(capacity)
+        self.jerk = np.empty(capacity)
+        self.stages = np.empty(capacity, dtype=int)
+        self.capacity = capacity
+
 class SCurve:
     """S型曲線運動規劃器。
 
@@ -10,9 +288,12 @@ class SCurve:
         max_speed (float): 最大速度限制 (m/s)
         max_acceleration (float): 最大加速度限制 (m/s²)
         max_jerk (float): 最大加加速度限制 (m/s³)
+        max_deceleration (float): 最大減速度限制 (m/s²)
+        max_decel_jerk (float): 減速段的最大加加速度限制 (m/s³)
     """
 
-    def __init__(self, max_distance, max_speed, max_acceleration, max_jerk):
+    def __init__(self, max_distance, max_speed, max_acceleration, max_jerk,
+                 max_deceleration=None, max_decel_jerk=None):
         """初始化 S-Curve 規劃器。
 
         Args:
@@ -20,98 +301,87 @@ class SCurve:
             max_speed (float): 最大速度限制
             max_acceleration (float): 最大加速度限制
             max_jerk (float): 最大加加速度限制
+            max_deceleration (float): 最大減速度限制，None 時與 max_acceleration 相同
+            max_decel_jerk (float): 減速段的最大加加速度限制，None 時與 max_jerk 相同
 
         Raises:
             ValueError: 當任何參數小於或等於0時
             ValueError: 當加加速度小於加速度時
         """
-        if any(v <= 0 for v in [max_distance, max_speed, max_acceleration, max_jerk]):
+        if max_deceleration is None:
+            max_deceleration = max_acceleration
+        if max_decel_jerk is None:
+            max_decel_jerk = max_jerk
+        
+        if any(v <= 0 for v in [max_distance, max_speed, max_acceleration, max_jerk,
+                                max_deceleration, max_decel_jerk]):
             raise ValueError("All parameters must be positive")
         
-        if max_jerk < max_acceleration:
+        if max_jerk < max_acceleration or max_decel_jerk < max_deceleration:
             raise ValueError("Jerk must be greater than acceleration for proper motion planning")
         
         self.max_distance = max_distance
         self.max_speed = max_speed
         self.max_acceleration = max_acceleration
         self.max_jerk = max_jerk
+        self.max_deceleration = max_deceleration
+        self.max_decel_jerk = max_decel_jerk
 
-    def calculate_profile(self, dt=0.01, use_numpy=True):
+    def calculate_profile(self, dt=0.01, use_numpy=True, out=None):
         """計算完整的運動曲線。
 
         Args:
             dt (float): 時間步長 (秒)
             use_numpy (bool): 是否使用 NumPy 進行計算優化
+            out (ProfileWorkspace): 可重複使用的輸出緩衝區，僅適用於 use_numpy=True。
+                提供時回傳的陣列為 out 的視圖，下一次使用同一個 out 計算時會被覆寫
 
         Returns:
             dict: 運動曲線數據
+
+        Raises:
+            ValueError: 當 use_numpy=False 卻提供 out 時
         """
         if use_numpy:
-            return self._calculate_profile_numpy(dt)
+            return self._calculate_profile_numpy(dt, out)
         else:
+            if out is not None:
+                raise ValueError("out is only supported with use_numpy=True")
             return self._calculate_profile_python(dt)
 
     def calculate_max_reachable_speed(self, distance):
         """計算在給定距離內能達到的最大速度，確保能夠及時減速到0"""
-        # 使用二分搜尋法找到合適的最大速度
-        v_min = 0.01
-        v_max = self.max_speed
-        
-        for _ in range(20):  # 最多20次迭代
-            v_target = (v_min + v_max) / 2
-            
-            # 計算達到這個速度所需的時間和距離
-            t_j = self.max_acceleration / self.max_jerk
-            t_a = v_target / self.max_acceleration
-            
-            # 計算加速階段的距離
-            d_j1 = (self.max_jerk * t_j**3) / 6
-            d_a = self.max_acceleration * t_j * t_j/2 + self.max_acceleration * (t_a - t_j) * t_j
-            d_j2 = self.max_acceleration * t_j * t_j/2 - (self.max_jerk * t_j**3) / 6
-            
-            # 總距離是加速和減速階段的距離之和
-            total_distance = 2 * (d_j1 + d_a + d_j2)
-            
-            if abs(total_distance - distance) < 0.001:
-                return v_target
-            elif total_distance > distance:
-                v_max = v_target
-            else:
-                v_min = v_target
-        
-        return v_max
+        return self._solve(distance)[0]
+
+    def _solve(self, distance):
+        return _solve_stage_durations_scalar(distance, self.max_speed,
+                                             self.max_acceleration, self.max_jerk,
+                                             self.max_deceleration, self.max_decel_jerk)
 
     def generate_stages(self):
-        # 首先計算在給定距離內能達到的最大速度
-        achievable_speed = self.calculate_max_reachable_speed(self.max_distance)
-        
-        # 使用計算出的速度重新計算時間參數
-        t_j = self.max_acceleration / self.max_jerk
-        t_a = achievable_speed / self.max_acceleration
-        
-        # 計算加速階段的距離
-        d_j1 = (self.max_jerk * t_j**3) / 6
-        d_a = self.max_acceleration * t_j * t_j/2 + self.max_acceleration * (t_a - t_j) * t_j
-        d_j2 = self.max_acceleration * t_j * t_j/2 - (self.max_jerk * t_j**3) / 6
-        
-        d_accel = d_j1 + d_a + d_j2
+        """以解析解計算各階段的 jerk 與時間。
+
+        Returns:
+            dict: 'names'、'jerks'、'durations' 為各階段資料，'peak_speed' 為峰值速度
+        """
+        peak_speed, durations = self._solve(self.max_distance)
+        jerks = [self.max_jerk, 0, -self.max_jerk, 0, -self.max_decel_jerk, 0, self.max_decel_jerk]
         
-        if self.max_distance > 2 * d_accel:
+        if durations[3] > 0:
             # 需要恆速階段
-            d_const_vel = self.max_distance - 2 * d_accel
-            t_v = d_const_vel / achievable_speed
-            
             return {
-                'names': ['J1', 'A', 'J2', 'V', 'J3', 'D', 'J4'],
-                'jerks': [self.max_jerk, 0, -self.max_jerk, 0, -self.max_jerk, 0, self.max_jerk],
-                'durations': [t_j, t_a - t_j, t_j, t_v, t_j, t_a - t_j, t_j]
+                'names': list(STAGE_NAMES),
+                'jerks': jerks,
+                'durations': durations,
+                'peak_speed': peak_speed
             }
         else:
             # 不需要恆速階段
             return {
-                'names': ['J1', 'A', 'J2', 'J3', 'D', 'J4'],
-                'jerks': [self.max_jerk, 0, -self.max_jerk, -self.max_jerk, 0, self.max_jerk],
-                'durations': [t_j, t_a - t_j, t_j, t_j, t_a - t_j, t_j]
+                'names': STAGE_NAMES[:3] + STAGE_NAMES[4:],
+                'jerks': jerks[:3] + jerks[4:],
+                'durations': durations[:3] + durations[4:],
+                'peak_speed': peak_speed
             }
 
     def _adjust_stages(self, stages):
@@ -137,7 +407,7 @@ class SCurve:
             bool: 是否滿足所有約束
         """
         speed_ok = 0 <= velocity <= self.max_speed
-        accel_ok = -self.max_acceleration <= acceleration <= self.max_acceleration
+        accel_ok = -self.max_deceleration <= acceleration <= self.max_acceleration
         return speed_ok and accel_ok
 
     def validate_profile(self, profile):
@@ -154,43 +424,55 @@ class SCurve:
         jerks = np.array(profile['jerk'])
         
         speed_ok = np.all((velocities >= 0) & (velocities <= self.max_speed))
-        accel_ok = np.all(np.abs(accelerations) <= self.max_acceleration)
-        jerk_ok = np.all(np.abs(jerks) <= self.max_jerk)
+        accel_ok = np.all((accelerations >= -self.max_deceleration) & (accelerations <= self.max_acceleration))
+        jerk_ok = np.all(np.abs(jerks) <= max(self.max_jerk, self.max_decel_jerk))
         
         return speed_ok and accel_ok and jerk_ok
 
-    def _calculate_profile_numpy(self, dt):
+    def _calculate_profile_numpy(self, dt, out=None):
         """使用 NumPy 計算運動曲線。"""
         stages = self.generate_stages()
         total_time = sum(stages['durations'])
         
-        # 創建時間陣列
-        times = np.arange(0, total_time + dt, dt)
+        # 時間陣列長度與 np.arange(0, total_time + dt, dt) 相同
+        n = int(np.ceil((total_time + dt) / dt))
+        if out is None:
+            out = ProfileWorkspace(n)
+        else:
+            out.reserve(n)
         
-        # 初始化陣列
-        jerks = np.zeros_like(times)
-        accelerations = np.zeros_like(times)
-        velocities = np.zeros_like(times)
-        positions = np.zeros_like(times)
-        stage_indices = np.zeros_like(times, dtype=int)
+        # 在工作區中建立時間陣列並初始化其他陣列
+        times = out.time[:n]
+        np.multiply(out.index[:n], dt, out=times)
+        jerks = out.jerk[:n]
+        accelerations = out.acceleration[:n]
+        velocities = out.velocity[:n]
+        positions = out.position[:n]
+        stage_indices = out.stages[:n]
+        jerks.fill(0)
+        stage_indices.fill(0)
         
         # 改進階段索引和過渡的計算 - 添加微小重疊來確保連續性
+        # 以邊界索引切片取代整段長度的布林遮罩，times 為遞增序列，
+        # searchsorted(times, t) 即為第一個 times >= t 的索引
         current_time = 0
+        start_idx = 0
         for i, (jerk, duration) in enumerate(zip(stages['jerks'], stages['durations'])):
             # 使用微小的重疊確保階段之間的連續性
             if i > 0:  # 不是第一個階段
                 overlap_start = max(0, current_time - dt)  # 重疊開始時間
-                mask_overlap = (times >= overlap_start) & (times < current_time)
-                # 在重疊區域設置混合值
-                overlap_ratio = (times[mask_overlap] - overlap_start) / (current_time - overlap_start)
-                # 讓重疊點的 jerk 逐漸過渡 (線性插值)
-                jerks[mask_overlap] = (1 - overlap_ratio) * stages['jerks'][i-1] + overlap_ratio * jerk
+                overlap_idx = int(np.searchsorted(times, overlap_start))
+                # 在重疊區域設置混合值 (線性插值)
+                for j in range(overlap_idx, start_idx):
+                    overlap_ratio = (times[j] - overlap_start) / (current_time - overlap_start)
+                    jerks[j] = (1 - overlap_ratio) * stages['jerks'][i-1] + overlap_ratio * jerk
             
             # 正常設置當前階段的值
-            mask = (times >= current_time) & (times < current_time + duration)
-            jerks[mask] = jerk
-            stage_indices[mask] = i
+            end_idx = int(np.searchsorted(times, current_time + duration))
+            jerks[start_idx:end_idx] = jerk
+            stage_indices[start_idx:end_idx] = i
             current_time += duration
+            start_idx = int(np.searchsorted(times, current_time))
         
         # 確保總時間範圍是正確的
         if times[-1] > total_time:
@@ -203,19 +485,22 @@ class SCurve:
         velocities[0] = 0     # 初始速度為0
         positions[0] = 0      # 初始位置為0
         
+        # 等速階段的目標速度直接取自 generate_stages 的峰值速度
+        has_const_vel = len(stages['names']) > 6
+        target_speed = stages['peak_speed']
+        
         # 使用更精確的積分方法
-        for i in range(1, len(times)):
+        for i in range(1, n):
             # 使用梯形法則計算加速度積分
             accelerations[i] = accelerations[i-1] + 0.5 * (jerks[i-1] + jerks[i]) * dt
-            accelerations[i] = np.clip(accelerations[i], -self.max_acceleration, self.max_acceleration)
+            accelerations[i] = min(max(accelerations[i], -self.max_deceleration), self.max_acceleration)
             
             # 使用梯形法則計算速度積分
             velocities[i] = velocities[i-1] + 0.5 * (accelerations[i-1] + accelerations[i]) * dt
-            velocities[i] = np.clip(velocities[i], 0, self.max_speed)
+            velocities[i] = min(max(velocities[i], 0), self.max_speed)
             
             # 在等速階段強制設置恆定速度
-            if stage_indices[i] == 3 and len(stages['names']) > 6:  # 有等速階段且是等速階段
-                target_speed = self.calculate_max_reachable_speed(self.max_distance)
+            if stage_indices[i] == 3 and has_const_vel:  # 有等速階段且是等速階段
                 # 使用平滑過渡而不是突變
                 velocities[i] = target_speed
                 accelerations[i] = 0
@@ -230,7 +515,7 @@ class SCurve:
             
             # 如果到達目標位置且速度接近0，則停止計算
             if positions[i] >= self.max_distance and velocities[i] <= 0.001:
-                # 裁剪陣列到當前索引
+                # 裁剪到當前索引 (僅建立視圖，不複製資料)
                 times = times[:i+1]
                 positions = positions[:i+1]
                 velocities = velocities[:i+1]
@@ -272,6 +557,9 @@ class SCurve:
         jerks = []
         stage_indices = []
         
+        # 等速階段的目標速度
+        target_speed = stages['peak_speed']
+        
         # 初始狀態
         t = 0
         position = 0
@@ -293,7 +581,7 @@ class SCurve:
             
             # 更新加速度
             acceleration += current_jerk * dt
-            acceleration = max(-self.max_acceleration, 
+            acceleration = max(-self.max_deceleration, 
                              min(self.max_acceleration, acceleration))
             
             # 更新速度
@@ -302,7 +590,7 @@ class SCurve:
             
             # 在等速階段保持速度不變
             if current_stage == 3:  # 等速階段
-                velocity = self.calculate_max_reachable_speed(self.max_distance)
+                velocity = target_speed
                 acceleration = 0
             
             # 更新位置
@@ -0,0 +1,557 @@
+"""以 multiprocessing.shared_memory 實作的設定點環形緩衝區。
+
+規劃器 (producer) 將運動曲線取樣或階段規劃寫入共享記憶體中的環形緩衝區，
+即時迴圈所在的程序 (consumer) 以零拷貝的 NumPy 視圖讀取。
+
+記憶體配置 (皆為 64 位元組對齊)::
+
+    [header: int64 x (HEADER_SLOTS + 2 * max_consumers)]   固定欄位、各消費者的 read_seq 與 pid
+    [data:   dtype x capacity]
+
+寫入端只有一個，不需要鎖：生產者先公告 reserve_seq、寫入資料，最後才更新
+write_seq；每個消費者只更新自己的 read_seq。序號單調遞增，槽位為序號對
+capacity 取餘數，消費者比較序號即可偵測資料是否已被覆寫。
+
+記憶體順序：上述協定依賴「程式中先寫入的資料，其他程序也先看到」。
+x86 (TSO) 保證這一點；ARM 等弱記憶體順序的 CPU 不保證，而 Python / NumPy
+的一般寫入不提供記憶體屏障，消費者可能先看到新的 write_seq 才看到資料。
+在這類平台上請勿依賴本模組的一致性保證。
+
+需要 Python 3.8 以上 (multiprocessing.shared_memory)。
+"""
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# 運動曲線取樣 (對應 SCurve.calculate_profile 的輸出)
+SAMPLE_DTYPE = np.dtype([
+    ('time', np.float64),
+    ('position', np.float64),
+    ('velocity', np.float64),
+    ('acceleration', np.float64),
+    ('jerk', np.float64),
+    ('stage', np.int64),
+])
+
+# 階段規劃 (對應 SCurve.generate_stages 的輸出)
+STAGE_DTYPE = np.dtype([
+    ('stage', np.int64),
+    ('jerk', np.float64),
+    ('duration', np.float64),
+])
+
+_ALIGN = 64
+
+# header 欄位索引
+_WRITE_SEQ = 0
+_CAPACITY = 1
+_ITEMSIZE = 2
+_MAX_CONSUMERS = 3
+_CLOSED = 4
+_RESERVE_SEQ = 5
+HEADER_SLOTS = 8
+
+# read_seq 為此值表示該消費者尚未連線，不參與背壓計算
+_INACTIVE = -1
+
+
+if os.name == 'nt':
+    import ctypes
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    _STILL_ACTIVE = 259
+    _ERROR_ACCESS_DENIED = 5
+
+    def _pid_alive(pid):
+        # Windows 的 os.kill 會終止程序，不能用來檢查存活
+        handle = _kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+        try:
+            code = ctypes.c_ulong()
+            if not _kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == _STILL_ACTIVE
+        finally:
+            _kernel32.CloseHandle(handle)
+else:
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+
+class RingOverrunError(RuntimeError):
+    """消費者讀取速度跟不上，資料已被生產者覆寫。
+
+    Attributes:
+        lost (int): 遺失的記錄數量
+    """
+
+    def __init__(self, lost):
+        super().__init__(f"Ring buffer overrun: {lost} records lost")
+        self.lost = lost
+
+
+def _attach_shared_memory(name):
+    """連接既有的共享記憶體，且不向 resource_tracker 註冊。
+
+    只有建立者負責刪除共享記憶體。若連接端也註冊，程序結束時其
+    resource_tracker 會刪除生產者的共享記憶體；與建立者共用 resource_tracker
+    的子程序 (fork / spawn / forkserver) 則會讓建立者 unlink() 時重複取消註冊。
+    """
+    try:
+        # Python 3.13+
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Python 3.12 以前：建構期間暫時略過 shared_memory 的註冊 (等同 track=False)。
+    # 替換的是模組屬性，同一程序中其他執行緒此時建立的共享記憶體也不會被註冊
+    register = resource_tracker.register
+
+    def _register(resource_name, rtype):
+        if rtype != "shared_memory":
+            register(resource_name, rtype)
+
+    resource_tracker.register = _register
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _aligned(nbytes):
+    return (nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _wait_until(predicate, timeout):
+    """以退避方式輪詢直到 predicate 成立；逾時回傳 False。"""
+    if predicate():
+        return True
+    if timeout is not None and timeout <= 0:
+        return False
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.0
+    while not predicate():
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        # 先讓出 CPU，再逐漸拉長睡眠時間，上限 1 ms
+        delay = min(delay * 2 or 1e-6, 1e-3)
+    return True
+
+
+class SetpointRing:
+    """共享記憶體中的環形緩衝區。
+
+    使用 create() 建立、attach() 於其他程序中連接；再透過 producer() /
+    consumer() 取得讀寫端。
+
+    Attributes:
+        name (str): 共享記憶體名稱，傳給其他程序以 attach()
+        capacity (int): 槽位數量
+        dtype (numpy.dtype): 記錄型別
+        max_consumers (int): 最多可同時連線的消費者數量
+    """
+
+    def __init__(self, shm, dtype, owner):
+        self._shm = shm
+        # 以 fork 複製到子程序時不應由子程序刪除共享記憶體
+        self._owner_pid = os.getpid() if owner else None
+        self.dtype = np.dtype(dtype)
+
+        buf = shm.buf
+        # 先讀取固定欄位以得知消費者數量
+        fixed = np.ndarray(HEADER_SLOTS, dtype=np.int64, buffer=buf)
+        self.capacity = int(fixed[_CAPACITY])
+        self.max_consumers = int(fixed[_MAX_CONSUMERS])
+        if int(fixed[_ITEMSIZE]) != self.dtype.itemsize:
+            raise ValueError("dtype does not match the ring buffer layout")
+
+        del fixed
+        self._header = np.ndarray(HEADER_SLOTS + 2 * self.max_consumers,
+                                  dtype=np.int64, buffer=buf)
+        self._read_seqs = self._header[HEADER_SLOTS:HEADER_SLOTS + self.max_consumers]
+        self._pids = self._header[HEADER_SLOTS + self.max_consumers:]
+        self._data = np.ndarray(self.capacity, dtype=self.dtype, buffer=buf,
+                                offset=_aligned(8 * (HEADER_SLOTS + 2 * self.max_consumers)))
+
+    @classmethod
+    def create(cls, capacity, dtype=SAMPLE_DTYPE, max_consumers=1, name=None):
+        """建立新的環形緩衝區。
+
+        Args:
+            capacity (int): 槽位數量
+            dtype (numpy.dtype): 記錄型別，預設為 SAMPLE_DTYPE
+            max_consumers (int): 最多可同時連線的消費者數量
+            name (str): 共享記憶體名稱，None 時自動產生
+
+        Raises:
+            ValueError: 當 capacity 或 max_consumers 小於或等於0時
+        """
+        if capacity <= 0 or max_consumers <= 0:
+            raise ValueError("capacity and max_consumers must be positive")
+
+        dtype = np.dtype(dtype)
+        size = _aligned(8 * (HEADER_SLOTS + 2 * max_consumers)) + dtype.itemsize * capacity
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray(HEADER_SLOTS + 2 * max_consumers, dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        header[_ITEMSIZE] = dtype.itemsize
+        header[_MAX_CONSUMERS] = max_consumers
+        header[HEADER_SLOTS:HEADER_SLOTS + max_consumers] = _INACTIVE
+        del header
+        return cls(shm, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, name, dtype=SAMPLE_DTYPE):
+        """連接到其他程序建立的環形緩衝區。
+
+        Args:
+            name (str): 共享記憶體名稱 (SetpointRing.name)
+            dtype (numpy.dtype): 記錄型別，需與建立時相同
+        """
+        return cls(_attach_shared_memory(name), dtype, owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def closed(self):
+        """生產者是否已停止寫入。"""
+        return bool(self._header[_CLOSED])
+
+    def producer(self, overwrite=False):
+        """取得寫入端 (每個緩衝區只能有一個)。"""
+        return SetpointProducer(self, overwrite=overwrite)
+
+    def consumer(self, consumer_id=0, force=False, from_oldest=False):
+        """取得讀取端 (同一個 consumer_id 同時只能有一個)。
+
+        Args:
+            consumer_id (int): 消費者編號
+            force (bool): True 時不論原使用者是否存活都接管此編號
+            from_oldest (bool): True 時從緩衝區中最舊的資料開始讀取，
+                預設只讀取連線之後才發佈的記錄
+        """
+        return SetpointConsumer(self, consumer_id, force=force, from_oldest=from_oldest)
+
+    def wait_for_consumers(self, count=1, timeout=None):
+        """等待至少 count 個消費者連線。
+
+        Args:
+            count (int): 需要的消費者數量
+            timeout (float): 最長等待秒數，None 表示無限等待
+
+        Returns:
+            bool: 是否在時間內達到數量
+        """
+        return _wait_until(
+            lambda: sum(self._slot_alive(i) for i in range(self.max_consumers)) >= count,
+            timeout)
+
+    def _slot_alive(self, consumer_id):
+        """此編號是否已被仍存活的程序佔用。"""
+        if self._read_seqs[consumer_id] == _INACTIVE:
+            return False
+        return _pid_alive(int(self._pids[consumer_id]))
+
+    def _reap_dead_consumers(self):
+        """釋放未呼叫 close() 就結束的消費者所佔用的編號。"""
+        for consumer_id in range(self.max_consumers):
+            if self._read_seqs[consumer_id] != _INACTIVE and not self._slot_alive(consumer_id):
+                self._read_seqs[consumer_id] = _INACTIVE
+
+    def close(self):
+        """釋放本程序對共享記憶體的映射；建立者同時刪除共享記憶體。"""
+        if self._shm is None:
+            return
+        # 必須先釋放所有 NumPy 視圖，否則 mmap 無法關閉
+        self._header = self._read_seqs = self._pids = self._data = None
+        self._shm.close()
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __reduce__(self):
+        # 傳遞到子程序時以名稱重新連接
+        return (SetpointRing.attach, (self.name, self.dtype))
+
+
+class SetpointProducer:
+    """環形緩衝區的寫入端。
+
+    典型用法為 reserve() 取得可寫入的視圖、直接填入資料後 commit()；
+    write() / write_profile() / write_stages() 為其便利包裝。
+
+    Attributes:
+        overwrite (bool): True 時不等待消費者，直接覆寫最舊的資料
+    """
+
+    def __init__(self, ring, overwrite=False):
+        self._ring = ring
+        self.overwrite = overwrite
+        self._write_seq = int(ring._header[_WRITE_SEQ])
+
+    @property
+    def sequence(self):
+        """下一筆記錄的序號 (即目前已發佈的記錄總數)。"""
+        return self._write_seq
+
+    def free_space(self):
+        """在不覆寫未讀資料的前提下，目前可寫入的記錄數量。
+
+        空間不足時會先釋放已結束程序所佔用的消費者編號，
+        避免當機的消費者讓生產者永久阻塞。
+        """
+        ring = self._ring
+        if self.overwrite:
+            return ring.capacity
+        free = self._free_space()
+        if free <= 0:
+            ring._reap_dead_consumers()
+            free = self._free_space()
+        return free
+
+    def _free_space(self):
+        ring = self._ring
+        active = ring._read_seqs[ring._read_seqs != _INACTIVE]
+        if active.size == 0:
+            return ring.capacity
+        return ring.capacity - (self._write_seq - int(active.min()))
+
+    def reserve(self, count, timeout=None):
+        """取得最多 count 筆連續且可寫入的槽位。
+
+        因為環形緩衝區會繞回，回傳的視圖可能比 count 短；
+        空間不足時依 timeout 等待消費者讀取 (背壓)。
+
+        Args:
+            count (int): 想要寫入的記錄數量
+            timeout (float): 最長等待秒數，None 表示無限等待，0 表示不等待
+
+        Returns:
+            numpy.ndarray: 共享記憶體中的可寫視圖，逾時時長度為0
+        """
+        ring = self._ring
+        if not _wait_until(lambda: self.free_space() > 0, timeout):
+            return ring._data[:0]
+
+        start = self._write_seq % ring.capacity
+        n = min(count, self.free_space(), ring.capacity - start)
+        # 先公告即將覆寫的範圍，再寫入資料
+        ring._header[_RESERVE_SEQ] = self._write_seq + n
+        return ring._data[start:start + n]
+
+    def commit(self, count):
+        """發佈 reserve() 後已填入的前 count 筆記錄。"""
+        self._write_seq += count
+        # 最後才更新 write_seq；在 x86 (TSO) 上消費者看到時資料已寫入完成，
+        # 弱記憶體順序的 CPU 則無此保證 (見模組說明)
+        self._ring._header[_WRITE_SEQ] = self._write_seq
+
+    def write(self, records, timeout=None):
+        """寫入一組記錄，空間不足時等待。
+
+        Args:
+            records (numpy.ndarray): 型別為 ring.dtype 的記錄陣列
+            timeout (float): 整體最長等待秒數，None 表示無限等待
+
+        Returns:
+            int: 實際寫入的記錄數量
+
+        Raises:
+            TimeoutError: 當 timeout 不為 None 且時間內未能全部寫入時
+        """
+        return self._write_fields(len(records), records, self._ring.dtype.names, timeout)
+
+    def write_profile(self, profile, timeout=None):
+        """將 SCurve.calculate_profile 的結果寫入 (ring 需為 SAMPLE_DTYPE)。"""
+        columns = {
+            'time': profile['time'],
+            'position': profile['position'],
+            'velocity': profile['velocity'],
+            'acceleration': profile['acceleration'],
+            'jerk': profile['jerk'],
+            'stage': profile['stages'],
+        }
+        return self._write_fields(len(profile['time']), columns, SAMPLE_DTYPE.names, timeout)
+
+    def write_stages(self, stages, timeout=None):
+        """將 SCurve.generate_stages 的結果寫入 (ring 需為 STAGE_DTYPE)。"""
+        columns = {
+            'stage': np.arange(len(stages['jerks'])),
+            'jerk': stages['jerks'],
+            'duration': stages['durations'],
+        }
+        return self._write_fields(len(stages['jerks']), columns, STAGE_DTYPE.names, timeout)
+
+    def _write_fields(self, total, columns, names, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        written = 0
+        while written < total:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            view = self.reserve(total - written, timeout=remaining)
+            n = len(view)
+            if n == 0:
+                raise TimeoutError(f"Ring buffer full: wrote {written} of {total} records")
+            for name in names:
+                view[name] = np.asarray(columns[name])[written:written + n]
+            self.commit(n)
+            written += n
+        return written
+
+    def close(self):
+        """通知消費者不會再有新資料。"""
+        self._ring._header[_CLOSED] = 1
+
+
+class SetpointConsumer:
+    """環形緩衝區的讀取端。
+
+    acquire() 回傳共享記憶體中的唯讀視圖 (零拷貝)，處理完畢後呼叫
+    release() 歸還槽位；在 release() 之前生產者不會覆寫這些資料
+    (overwrite 模式除外，此時 release() 會檢查序號偵測覆寫)。
+
+    每個編號記錄佔用程序的 pid；程序未呼叫 close() 就結束時，該編號可再次使用。
+    佔用編號是「檢查後寫入」而非原子操作，兩個存活的程序同時以同一編號連線
+    可能都會成功，部署時應為每個程序分配不同的編號。
+
+    Attributes:
+        consumer_id (int): 消費者編號 (0 ~ max_consumers-1)
+        overruns (int): 累計遺失的記錄數量
+    """
+
+    def __init__(self, ring, consumer_id=0, force=False, from_oldest=False):
+        """連線並佔用消費者編號。
+
+        Raises:
+            ValueError: 當 consumer_id 超出範圍，或已被存活的程序佔用且 force 為 False 時
+        """
+        if not 0 <= consumer_id < ring.max_consumers:
+            raise ValueError(f"consumer_id must be in [0, {ring.max_consumers})")
+        if not force and ring._slot_alive(consumer_id):
+            raise ValueError(f"consumer_id {consumer_id} is already in use")
+
+        self._ring = ring
+        self.consumer_id = consumer_id
+        self.overruns = 0
+        self._pending = 0
+
+        if from_oldest:
+            # 從目前仍有效的最舊資料開始讀取
+            self._read_seq = max(0, int(ring._header[_RESERVE_SEQ]) - ring.capacity)
+        else:
+            # 只讀取新發佈的記錄，避免中途加入的即時迴圈重播其他消費者已執行過的設定點
+            self._read_seq = int(ring._header[_WRITE_SEQ])
+        # 先寫入 pid 再寫入 read_seq，其他程序看到編號啟用時 pid 已是本程序
+        ring._pids[consumer_id] = os.getpid()
+        ring._read_seqs[consumer_id] = self._read_seq
+
+    @property
+    def sequence(self):
+        """下一筆要讀取的記錄序號。"""
+        return self._read_seq
+
+    def available(self):
+        """目前可讀取的記錄數量。"""
+        return int(self._ring._header[_WRITE_SEQ]) - self._read_seq
+
+    @property
+    def drained(self):
+        """生產者已關閉且所有資料都已讀取。"""
+        return self._ring.closed and self.available() == 0
+
+    def acquire(self, max_items=None, timeout=0):
+        """取得連續的可讀記錄視圖。
+
+        Args:
+            max_items (int): 最多取得的記錄數量，None 表示不限
+            timeout (float): 無資料時最長等待秒數，None 表示無限等待
+
+        Returns:
+            tuple: (第一筆記錄的序號, 唯讀 numpy.ndarray 視圖)；無資料時視圖長度為0
+
+        Raises:
+            RingOverrunError: 當未讀資料已被覆寫時 (讀取位置會跳到最舊的有效資料)
+        """
+        ring = self._ring
+        _wait_until(lambda: self.available() > 0 or ring.closed, timeout)
+
+        lost = self._lost()
+        if lost > 0:
+            self._skip(lost)
+            raise RingOverrunError(lost)
+
+        available = self.available()
+        start = self._read_seq % ring.capacity
+        n = min(available, ring.capacity - start)
+        if max_items is not None:
+            n = min(n, max_items)
+
+        view = ring._data[start:start + n]
+        view.flags.writeable = False
+        self._pending = n
+        return self._read_seq, view
+
+    def release(self, count=None):
+        """歸還 acquire() 取得的前 count 筆記錄，預設為全部。
+
+        Raises:
+            RingOverrunError: 當這些記錄在讀取期間已被覆寫時
+        """
+        ring = self._ring
+        if count is None:
+            count = self._pending
+        if count > self._pending:
+            raise ValueError("Cannot release more records than acquired")
+
+        if count:
+            # 讀取期間生產者若已開始覆寫最舊的記錄，視圖內容可能不完整
+            lost = self._lost()
+            if lost > 0:
+                self._skip(lost)
+                raise RingOverrunError(lost)
+
+        self._read_seq += count
+        self._pending = 0
+        ring._read_seqs[self.consumer_id] = self._read_seq
+
+    def read(self, max_items=None, timeout=0):
+        """讀取記錄並複製出共享記憶體，適合不需零拷貝的場合。"""
+        seq, view = self.acquire(max_items, timeout)
+        records = view.copy()
+        self.release()
+        return seq, records
+
+    def _lost(self):
+        # 生產者已公告覆寫到的序號 - capacity 之前的記錄皆不再有效
+        return int(self._ring._header[_RESERVE_SEQ]) - self._ring.capacity - self._read_seq
+
+    def _skip(self, lost):
+        self.overruns += lost
+        self._read_seq += lost
+        self._pending = 0
+        self._ring._read_seqs[self.consumer_id] = self._read_seq
+
+    def close(self):
+        """中斷連線，不再參與背壓計算。"""
+        self._ring._read_seqs[self.consumer_id] = _INACTIVE
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 與 main.py 相同，以 src 為匯入根目錄
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
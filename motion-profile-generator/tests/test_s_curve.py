@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from models.s_curve import SCurve, _solve_stage_durations_scalar, solve_stage_durations
+
+
+def _random_limits(count, seed=0):
+    """涵蓋四種峰值速度分支的隨機移動與限制，jerk 不小於加速度。"""
+    rng = np.random.default_rng(seed)
+    distance = 10 ** rng.uniform(-4, 2, count)
+    max_speed = 10 ** rng.uniform(-2, 1, count)
+    max_acceleration = 10 ** rng.uniform(-2, 1, count)
+    max_jerk = max_acceleration * 10 ** rng.uniform(0, 2, count)
+    max_deceleration = 10 ** rng.uniform(-2, 1, count)
+    max_decel_jerk = max_deceleration * 10 ** rng.uniform(0, 2, count)
+    return distance, max_speed, max_acceleration, max_jerk, max_deceleration, max_decel_jerk
+
+
+def _integrate(jerks, durations):
+    """逐段以等加加速度的解析式積分，回傳最終 (位置, 速度, 加速度) 與最大速度、加速度。"""
+    position = velocity = acceleration = 0.0
+    peak_velocity = peak_acceleration = 0.0
+    for jerk, t in zip(jerks, durations):
+        position += velocity * t + acceleration * t * t / 2 + jerk * t ** 3 / 6
+        velocity += acceleration * t + jerk * t * t / 2
+        acceleration += jerk * t
+        peak_velocity = max(peak_velocity, velocity)
+        peak_acceleration = max(peak_acceleration, abs(acceleration))
+    return position, velocity, acceleration, peak_velocity, peak_acceleration
+
+
+def test_scalar_and_batch_solvers_agree():
+    limits = _random_limits(20000)
+    batch = solve_stage_durations(*limits)
+    for i, args in enumerate(zip(*limits)):
+        peak, durations = _solve_stage_durations_scalar(*args)
+        assert peak == pytest.approx(batch['peak_speed'][i], rel=1e-12)
+        # 等加速段時間是 v/A - A/J 的差，誤差以整段移動時間為尺度
+        np.testing.assert_allclose(durations, batch['durations'][i],
+                                   rtol=1e-12, atol=1e-12 * sum(durations))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_stages_integrate_to_target_at_rest(seed):
+    for D, V, A, J, Ad, Jd in zip(*_random_limits(500, seed)):
+        stages = SCurve(D, V, A, J, Ad, Jd).generate_stages()
+        position, velocity, acceleration, peak_velocity, peak_acceleration = _integrate(
+            stages['jerks'], stages['durations'])
+
+        assert position == pytest.approx(D, rel=1e-9)
+        assert abs(velocity) <= 1e-9 * stages['peak_speed']
+        assert abs(acceleration) <= 1e-9 * max(A, Ad)
+        assert peak_velocity == pytest.approx(stages['peak_speed'], rel=1e-9)
+        assert peak_velocity <= V * (1 + 1e-12)
+        assert peak_acceleration <= max(A, Ad) * (1 + 1e-12)
+
+
+@pytest.mark.parametrize('index', range(6))
+def test_batch_solver_rejects_non_positive_parameters(index):
+    limits = [np.full(3, 1.0) for _ in range(6)]
+    limits[index][1] = 0.0
+    with pytest.raises(ValueError):
+        solve_stage_durations(*limits)
@@ -0,0 +1,197 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from conftest import SRC
+from utils.setpoint_ring import SAMPLE_DTYPE, RingOverrunError, SetpointRing
+
+
+@pytest.fixture
+def ring():
+    ring = SetpointRing.create(8, max_consumers=2)
+    yield ring
+    ring.close()
+
+
+def _records(start, count):
+    records = np.zeros(count, dtype=SAMPLE_DTYPE)
+    records['time'] = np.arange(start, start + count)
+    return records
+
+
+def _run_script(tmp_path, code):
+    # spawn / forkserver 子程序需要從檔案重新匯入主模組
+    script = tmp_path / 'script.py'
+    script.write_text(textwrap.dedent(code))
+    env = dict(os.environ, PYTHONPATH=SRC)
+    return subprocess.run([sys.executable, str(script)], env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_records_survive_wraparound(ring):
+    producer = ring.producer()
+    consumer = ring.consumer()
+    received = []
+    for start in range(0, 30, 5):
+        producer.write(_records(start, 5), timeout=1)
+        while consumer.available():
+            seq, view = consumer.acquire()
+            # 視圖不會跨越緩衝區尾端
+            assert seq % ring.capacity + len(view) <= ring.capacity
+            assert seq == len(received)
+            received.extend(view['time'])
+            consumer.release()
+    assert received == list(range(30))
+
+
+def test_producer_waits_for_slowest_consumer(ring):
+    producer = ring.producer()
+    fast = ring.consumer(0)
+    slow = ring.consumer(1)
+    producer.write(_records(0, 8))
+
+    fast.read()
+    assert len(producer.reserve(1, timeout=0)) == 0
+    with pytest.raises(TimeoutError):
+        producer.write(_records(8, 1), timeout=0.05)
+
+    slow.acquire(max_items=3)
+    slow.release()
+    assert producer.free_space() == 3
+
+
+def test_blocked_write_resumes_after_release(ring):
+    producer = ring.producer()
+    consumer = ring.consumer()
+    producer.write(_records(0, 8))
+
+    def drain_later():
+        time.sleep(0.05)
+        consumer.read()
+
+    thread = threading.Thread(target=drain_later)
+    thread.start()
+    assert producer.write(_records(8, 4), timeout=5) == 4
+    thread.join()
+
+
+def test_overwrite_during_read_raises_on_release(ring):
+    producer = ring.producer(overwrite=True)
+    consumer = ring.consumer()
+    producer.write(_records(0, 4))
+
+    seq, view = consumer.acquire()
+    assert seq == 0
+    producer.write(_records(4, 8))
+    del view
+    with pytest.raises(RingOverrunError) as excinfo:
+        consumer.release()
+    assert excinfo.value.lost == 4
+    assert consumer.overruns == 4
+    assert consumer.sequence == 4
+
+
+def test_acquire_after_lap_raises_and_resyncs(ring):
+    producer = ring.producer(overwrite=True)
+    consumer = ring.consumer()
+    producer.write(_records(0, 20))
+
+    with pytest.raises(RingOverrunError) as excinfo:
+        consumer.acquire()
+    assert excinfo.value.lost == 12
+    seq, records = consumer.read()
+    assert seq == 12
+    assert list(records['time']) == list(range(12, 16))
+
+
+def test_new_consumer_skips_records_published_before_it(ring):
+    producer = ring.producer()
+    producer.write(_records(0, 5))
+
+    latest = ring.consumer(0)
+    oldest = ring.consumer(1, from_oldest=True)
+    assert latest.available() == 0
+    assert oldest.available() == 5
+
+
+def test_consumer_id_in_use_is_rejected_until_closed(ring):
+    consumer = ring.consumer(0)
+    with pytest.raises(ValueError):
+        ring.consumer(0)
+    with pytest.raises(ValueError):
+        ring.consumer(2)
+
+    consumer.close()
+    ring.consumer(0).close()
+    ring.consumer(0, force=True)
+
+
+def test_slot_of_dead_consumer_is_reclaimed(ring, tmp_path):
+    result = _run_script(tmp_path, f"""
+        import os
+        from utils.setpoint_ring import SetpointRing
+        ring = SetpointRing.attach({ring.name!r})
+        ring.consumer(0)
+        os._exit(0)
+    """)
+    assert result.returncode == 0, result.stderr
+
+    # 當機的消費者不會讓生產者永久阻塞，其編號也可再次使用
+    producer = ring.producer()
+    assert producer.write(_records(0, 16), timeout=1) == 16
+    ring.consumer(0).close()
+
+
+def test_wait_for_consumers(ring):
+    assert not ring.wait_for_consumers(timeout=0)
+
+    def connect_later():
+        time.sleep(0.05)
+        ring.consumer(1)
+
+    thread = threading.Thread(target=connect_later)
+    thread.start()
+    assert ring.wait_for_consumers(timeout=5)
+    thread.join()
+
+
+def test_attaching_processes_do_not_unlink_or_untrack_the_segment(tmp_path):
+    result = _run_script(tmp_path, """
+        import multiprocessing as mp
+        import os
+        import subprocess
+        import sys
+
+        from utils.setpoint_ring import SetpointRing
+
+        def attach(name):
+            ring = SetpointRing.attach(name)
+            ring.consumer().close()
+            ring.close()
+
+        if __name__ == '__main__':
+            ring = SetpointRing.create(8)
+            for method in mp.get_all_start_methods():
+                proc = mp.get_context(method).Process(target=attach, args=(ring.name,))
+                proc.start()
+                proc.join()
+                assert proc.exitcode == 0
+            code = f"from utils.setpoint_ring import SetpointRing; SetpointRing.attach({ring.name!r}).close()"
+            subprocess.run([sys.executable, '-c', code], check=True)
+
+            SetpointRing.attach(ring.name).close()
+            name = ring.name
+            ring.close()
+            print(os.path.exists('/dev/shm/' + name) if os.name == 'posix' else False)
+    """)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'False'
+    # resource_tracker 的錯誤與洩漏警告都會寫到 stderr
+    assert 'KeyError' not in result.stderr
+    assert 'leaked' not in result.stderr